@@ -3,19 +3,43 @@ Flask Web App - Grid Trading Paper Trader UI (ENHANCED)
 With pagination, better caching, and detailed metrics
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-import pandas as pd
+import orjson
 from datetime import datetime, timedelta
 from paper_trader import PaperTradingEngine
 import threading
 import time
 import logging
+import csv
+import io
+import os
+import atexit
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class OrjsonProvider(JSONProvider):
+    """jsonify() backed by orjson (C encoder, handles numpy scalars/arrays)"""
+    
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.OPTIONS),
+                                        mimetype='application/json')
+
+
 app = Flask(__name__, template_folder='../frontend/templates', static_folder='../frontend/static')
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Initialize paper trading engine
@@ -27,15 +51,16 @@ coins_config = {
 }
 
 engine = PaperTradingEngine(coins_config)
+atexit.register(engine.close)  # flush buffered trades on shutdown
 
 # Global state
 trading_thread = None
 trading_active = False
 TRADING_INTERVAL = 60
 
-# Price cache (to avoid hammering exchange)
+# Price cache (to avoid hammering exchange): coin -> (price, expires_at)
 price_cache = {}
-last_price_fetch = {}
+price_cache_lock = threading.Lock()
 PRICE_CACHE_TTL = 30  # seconds
 
 
@@ -68,8 +93,10 @@ def index():
 def status():
     """Get current status"""
     try:
-        status_data = engine.get_status()
-        return jsonify(status_data) if status_data else jsonify({'error': 'Failed'}), 500
+        status_bytes = engine.get_status_json()  # serialized once per trading cycle
+        if status_bytes is None:
+            return jsonify({'error': 'Failed'}), 500
+        return Response(status_bytes, mimetype='application/json')
     except Exception as e:
         logger.error(f"Error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -85,34 +112,31 @@ def dashboard():
             return jsonify({'error': 'Failed'}), 500
         
         # Calculate totals
-        total_capital = sum([p['capital'] for p in engine.portfolio.values()])
-        total_inventory_value = sum([p.get('inventory_value', 0) for p in engine.portfolio.values()])
+        portfolio_view = status_data['portfolio']
+        total_capital = sum([p['capital'] for p in portfolio_view.values()])
+        total_inventory_value = sum([p.get('inventory_value', 0) for p in portfolio_view.values()])
         total_value = total_capital + total_inventory_value
         
         # Net P&L (AFTER tax and fees - already deducted in trades)
         net_pnl = total_value - 100000
         net_pnl_pct = (net_pnl / 100000) * 100
         
-        # Get all trades
-        all_trades = engine.get_recent_trades(limit=10000)
+        # Running trade aggregates (maintained on insert)
+        trade_stats = engine.get_trade_stats()
+        num_buy_trades = trade_stats['num_buy']
+        num_sell_trades = trade_stats['num_sell']
         
-        # Calculate metrics
-        buy_trades = [t for t in all_trades if t['type'] == 'BUY']
-        sell_trades = [t for t in all_trades if t['type'] == 'SELL']
-        winning_trades = [t for t in sell_trades if t.get('pnl', 0) > 0]
-        
-        win_rate = (len(winning_trades) / len(sell_trades) * 100) if sell_trades else 0
+        win_rate = (trade_stats['winning_trades'] / num_sell_trades * 100) if num_sell_trades else 0
         
         # Calculate returns
-        if sell_trades:
-            total_sell_revenue = sum([t.get('cost_or_revenue', 0) for t in sell_trades])
-            avg_trade_size = total_sell_revenue / len(sell_trades) if sell_trades else 0
+        if num_sell_trades:
+            avg_trade_size = trade_stats['total_sell_revenue'] / num_sell_trades
         else:
             avg_trade_size = 0
         
         # Start time (first trade or now if no trades)
-        if all_trades:
-            start_time = datetime.fromisoformat(all_trades[-1]['created_at'])
+        if trade_stats['first_trade_at']:
+            start_time = datetime.fromisoformat(trade_stats['first_trade_at'])
             trading_days = (datetime.now() - start_time).days + 1
         else:
             trading_days = 1
@@ -127,12 +151,12 @@ def dashboard():
             'net_pnl': net_pnl,
             'net_pnl_pct': net_pnl_pct,
             'num_trades': status_data['num_trades'],
-            'num_buy_trades': len(buy_trades),
-            'num_sell_trades': len(sell_trades),
+            'num_buy_trades': num_buy_trades,
+            'num_sell_trades': num_sell_trades,
             'win_rate_pct': win_rate,
             'avg_trade_size': avg_trade_size,
             'daily_return_pct': daily_return,
-            'portfolio': engine.portfolio,
+            'portfolio': portfolio_view,
             'trading_active': trading_active,
             'last_update': status_data['last_update'],
             'trading_days': trading_days
@@ -144,33 +168,24 @@ def dashboard():
 
 @app.route('/api/trades')
 def trades():
-    """Get paginated trades"""
+    """Get trades newest first, paginated by cursor (?before=<id>&limit=15)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = 15
-        
-        all_trades = engine.get_recent_trades(limit=10000)
+        before = request.args.get('before', None, type=int)
+        limit = request.args.get('limit', 15, type=int)
+        limit = max(1, min(limit, 100))
         
-        # Reverse to show newest first
-        all_trades = all_trades[::-1]
-        
-        # Paginate
-        total_trades = len(all_trades)
-        total_pages = (total_trades + per_page - 1) // per_page
-        
-        start = (page - 1) * per_page
-        end = start + per_page
-        
-        paginated_trades = all_trades[start:end]
+        # Fetch one extra row to know whether an older page exists
+        page_trades = engine.get_trades_before(before, limit + 1)
+        has_next = len(page_trades) > limit
+        page_trades = page_trades[:limit]
         
         return jsonify({
-            'trades': paginated_trades,
-            'page': page,
-            'per_page': per_page,
-            'total_trades': total_trades,
-            'total_pages': total_pages,
-            'has_next': page < total_pages,
-            'has_prev': page > 1
+            'trades': page_trades,
+            'before': before,
+            'limit': limit,
+            'next_cursor': page_trades[-1]['id'] if has_next else None,
+            'has_next': has_next,
+            'has_prev': before is not None
         })
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -190,13 +205,13 @@ def portfolio():
             
             portfolio_data.append({
                 'coin': coin,
-                'capital': round(data['capital'], 2),
-                'inventory': round(data['inventory'], 6),
-                'current_price': round(data['current_price'], 2),
-                'inventory_value': round(data['inventory_value'], 2),
-                'total_value': round(total_value, 2),
-                'pnl': round(pnl, 2),
-                'pnl_pct': round(pnl_pct, 2)
+                'capital': data['capital'],
+                'inventory': data['inventory'],
+                'current_price': data['current_price'],
+                'inventory_value': data['inventory_value'],
+                'total_value': total_value,
+                'pnl': pnl,
+                'pnl_pct': pnl_pct
             })
         
         return jsonify(portfolio_data)
@@ -210,22 +225,24 @@ def prices():
     """Get current prices (cached to reduce load)"""
     try:
         prices_data = {}
-        current_time = time.time()
+        now = time.time()
         
-        for coin in engine.portfolio.keys():
+        portfolio_view = engine.portfolio
+        
+        for coin, data in portfolio_view.items():
             # Check cache
-            if coin in price_cache and coin in last_price_fetch:
-                if current_time - last_price_fetch[coin] < PRICE_CACHE_TTL:
-                    prices_data[coin] = price_cache[coin]
-                    continue
+            entry = price_cache.get(coin)
+            if entry and entry[1] > now:
+                prices_data[coin] = entry[0]
+                continue
             
             # Fetch from engine
-            price = engine.portfolio[coin].get('current_price', 0)
+            price = data.get('current_price', 0)
             prices_data[coin] = price
             
             # Update cache
-            price_cache[coin] = price
-            last_price_fetch[coin] = current_time
+            with price_cache_lock:
+                price_cache[coin] = (price, now + PRICE_CACHE_TTL)
         
         return jsonify(prices_data)
     except Exception as e:
@@ -237,9 +254,9 @@ def prices():
 def stats():
     """Get detailed statistics"""
     try:
-        all_trades = engine.get_recent_trades(limit=10000)
+        trade_stats = engine.get_trade_stats()
         
-        if not all_trades:
+        if not trade_stats['num_trades']:
             return jsonify({
                 'total_trades': 0,
                 'buy_trades': 0,
@@ -250,27 +267,23 @@ def stats():
                 'avg_profit_per_trade': 0
             })
         
-        buy_trades = [t for t in all_trades if t['type'] == 'BUY']
-        sell_trades = [t for t in all_trades if t['type'] == 'SELL']
-        
-        profits = [t.get('pnl', 0) for t in sell_trades if t.get('pnl', 0) > 0]
-        losses = [t.get('pnl', 0) for t in sell_trades if t.get('pnl', 0) < 0]
+        num_sell_trades = trade_stats['num_sell']
+        total_profit = trade_stats['total_profit']
+        total_loss = trade_stats['total_loss']
+        winning_trades = trade_stats['winning_trades']
+        losing_trades = trade_stats['losing_trades']
         
-        total_profit = sum(profits)
-        total_loss = sum(losses)
+        win_rate = (winning_trades / num_sell_trades * 100) if num_sell_trades else 0
         
-        winning_trades = len(profits)
-        win_rate = (winning_trades / len(sell_trades) * 100) if sell_trades else 0
-        
-        avg_profit = (total_profit / len(profits)) if profits else 0
-        avg_loss = (total_loss / len(losses)) if losses else 0
+        avg_profit = (total_profit / winning_trades) if winning_trades else 0
+        avg_loss = (total_loss / losing_trades) if losing_trades else 0
         
         return jsonify({
-            'total_trades': len(all_trades),
-            'buy_trades': len(buy_trades),
-            'sell_trades': len(sell_trades),
+            'total_trades': trade_stats['num_trades'],
+            'buy_trades': trade_stats['num_buy'],
+            'sell_trades': num_sell_trades,
             'winning_trades': winning_trades,
-            'losing_trades': len(losses),
+            'losing_trades': losing_trades,
             'win_rate_pct': win_rate,
             'total_profit': round(total_profit, 2),
             'total_loss': round(total_loss, 2),
@@ -323,17 +336,30 @@ def stop_trading():
 
 @app.route('/api/export-trades')
 def export_trades():
-    """Export trades to CSV"""
+    """Export trades to CSV (streamed straight from SQLite)"""
     try:
-        trades_list = engine.get_recent_trades(limit=10000)
+        rows = engine.iter_all_trades()
+        first = next(rows, None)
         
-        if not trades_list:
+        if first is None:
             return jsonify({'error': 'No trades'}), 400
         
-        df = pd.DataFrame(trades_list)
-        csv = df.to_csv(index=False)
-        
-        return csv, 200, {'Content-Disposition': 'attachment; filename=trades.csv'}
+        def generate():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            
+            writer.writerow(first.keys())
+            writer.writerow(first)
+            yield buf.getvalue()
+            
+            for row in rows:
+                buf.seek(0)
+                buf.truncate()
+                writer.writerow(row)
+                yield buf.getvalue()
+        
+        return Response(generate(), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=trades.csv'})
     
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -353,4 +379,14 @@ def server_error(e):
 
 if __name__ == '__main__':
     logger.info("Starting Grid Trader Pro...")
-    app.run(debug=True, port=5000, use_reloader=False)
+    
+    if os.getenv('FLASK_ENV') == 'dev':
+        # Werkzeug dev server + debugger, local development only
+        # (no reloader: it would start a second trading engine)
+        app.run(debug=True, port=5000, use_reloader=False)
+    else:
+        # Threaded WSGI server so concurrent dashboard polls don't queue up
+        # (or: gunicorn -k gthread --threads 8 -w 1 app:app from backend/)
+        from waitress import serve
+        
+        serve(app, host='127.0.0.1', port=5000, threads=8)
@@ -6,23 +6,100 @@ import sqlite3
 from datetime import datetime
 import json
 import logging
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class TradeStats:
+    """Running trade aggregates, updated on every insert (O(1) reads)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Zero all aggregates"""
+        with self._lock:
+            self.num_buy = 0
+            self.num_sell = 0
+            self.total_profit = 0.0
+            self.total_loss = 0.0
+            self.winning_trades = 0
+            self.losing_trades = 0
+            self.total_sell_revenue = 0.0
+            self.first_trade_at = None
+    
+    def load(self, aggregates: dict):
+        """Rehydrate from TradeDatabase.get_aggregate_stats()"""
+        with self._lock:
+            self.num_buy = aggregates['num_buy']
+            self.num_sell = aggregates['num_sell']
+            self.total_profit = aggregates['total_profit']
+            self.total_loss = aggregates['total_loss']
+            self.winning_trades = aggregates['winning_trades']
+            self.losing_trades = aggregates['losing_trades']
+            self.total_sell_revenue = aggregates['total_sell_revenue']
+            self.first_trade_at = aggregates['first_trade_at']
+    
+    def record(self, trade_type: str, cost_or_revenue: float, pnl: float):
+        """Fold a newly inserted trade into the aggregates"""
+        with self._lock:
+            if trade_type == 'BUY':
+                self.num_buy += 1
+            elif trade_type == 'SELL':
+                self.num_sell += 1
+                self.total_sell_revenue += cost_or_revenue or 0
+                if pnl and pnl > 0:
+                    self.total_profit += pnl
+                    self.winning_trades += 1
+                elif pnl and pnl < 0:
+                    self.total_loss += pnl
+                    self.losing_trades += 1
+    
+    def snapshot(self) -> dict:
+        """Consistent copy of the aggregates"""
+        with self._lock:
+            return {
+                'num_trades': self.num_buy + self.num_sell,
+                'num_buy': self.num_buy,
+                'num_sell': self.num_sell,
+                'total_profit': self.total_profit,
+                'total_loss': self.total_loss,
+                'winning_trades': self.winning_trades,
+                'losing_trades': self.losing_trades,
+                'total_sell_revenue': self.total_sell_revenue,
+                'first_trade_at': self.first_trade_at
+            }
+
+
 class TradeDatabase:
     """SQLite database for trades"""
     
     def __init__(self, db_path='../data/trades.db'):
         self.db_path = db_path
+        self.stats = TradeStats()
+        
+        # One shared connection (autocommit, WAL) guarded by a lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        
         self.init_db()
+        self.load_stats()
     
     def init_db(self):
         """Create tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        with self._lock:
+            self._create_tables(self.conn.cursor())
+        logger.info("Database initialized ✅")
+    
+    def _create_tables(self, cursor):
+        """Schema and indexes"""
         # Trades table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS trades (
@@ -50,57 +127,186 @@ class TradeDatabase:
             )
         ''')
         
-        conn.commit()
-        conn.close()
-        logger.info("Database initialized ✅")
+        # Indexes matching the query shapes: per-coin history in time order,
+        # and the per-type win/loss aggregates (covers the old type-only index)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_trades_coin_ts'")
+        new_indexes = cursor.fetchone() is None
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_coin_ts ON trades(coin, timestamp DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_type_pnl ON trades(type, pnl)')
+        cursor.execute('DROP INDEX IF EXISTS idx_trades_type')
+        
+        # Refresh planner statistics once so the new indexes get picked up
+        if new_indexes:
+            cursor.execute('ANALYZE')
+    
+    def get_aggregate_stats(self) -> dict:
+        """Compute trade aggregates in SQL (single pass, no row materialization)"""
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    SELECT
+                        COUNT(CASE WHEN type = 'BUY' THEN 1 END),
+                        COUNT(CASE WHEN type = 'SELL' THEN 1 END),
+                        COALESCE(SUM(CASE WHEN type = 'SELL' AND pnl > 0 THEN pnl END), 0),
+                        COALESCE(SUM(CASE WHEN type = 'SELL' AND pnl < 0 THEN pnl END), 0),
+                        COUNT(CASE WHEN type = 'SELL' AND pnl > 0 THEN 1 END),
+                        COUNT(CASE WHEN type = 'SELL' AND pnl < 0 THEN 1 END),
+                        COALESCE(SUM(CASE WHEN type = 'SELL' THEN cost_or_revenue END), 0),
+                        MIN(created_at)
+                    FROM trades
+                ''')
+                (num_buy, num_sell, total_profit, total_loss, winning_trades,
+                 losing_trades, total_sell_revenue, first_trade_at) = cursor.fetchone()
+            
+            return {
+                'num_trades': num_buy + num_sell,
+                'num_buy': num_buy,
+                'num_sell': num_sell,
+                'total_profit': total_profit,
+                'total_loss': total_loss,
+                'winning_trades': winning_trades,
+                'losing_trades': losing_trades,
+                'total_sell_revenue': total_sell_revenue,
+                'first_trade_at': first_trade_at
+            }
+        except Exception as e:
+            logger.error(f"Error computing trade stats: {e}")
+            return None
+    
+    def load_stats(self):
+        """Rehydrate running trade aggregates from SQL"""
+        aggregates = self.get_aggregate_stats()
+        if aggregates is not None:
+            self.stats.load(aggregates)
     
     def add_trade(self, coin: str, trade_type: str, price: float, quantity: float, 
                   cost_or_revenue: float, pnl: float = 0):
         """Add trade to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    INSERT INTO trades (timestamp, coin, type, price, quantity, cost_or_revenue, pnl)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (datetime.now().isoformat(), coin, trade_type, price, quantity, cost_or_revenue, pnl))
+                
+                # Cache the first trade's timestamp once
+                if self.stats.first_trade_at is None:
+                    cursor.execute('SELECT created_at FROM trades WHERE id = ?', (cursor.lastrowid,))
+                    self.stats.first_trade_at = cursor.fetchone()[0]
             
-            cursor.execute('''
-                INSERT INTO trades (timestamp, coin, type, price, quantity, cost_or_revenue, pnl)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (datetime.now().isoformat(), coin, trade_type, price, quantity, cost_or_revenue, pnl))
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"Trade recorded: {coin} {trade_type} @ {price}")
+            self.stats.record(trade_type, cost_or_revenue, pnl)
+            logger.info("Trade recorded: %s %s @ %s", coin, trade_type, price)
             return True
         except Exception as e:
             logger.error(f"Error adding trade: {e}")
             return False
     
-    def get_all_trades(self, limit: int = 1000):
-        """Get all trades"""
+    def add_trades_bulk(self, rows: list):
+        """Add many trades in one transaction.
+        
+        rows: [(timestamp, coin, trade_type, price, quantity, cost_or_revenue, pnl), ...]
+        where timestamp is the ISO time the trade filled
+        """
+        if not rows:
+            return True
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('BEGIN')
+                try:
+                    cursor.executemany('''
+                        INSERT INTO trades (timestamp, coin, type, price, quantity, cost_or_revenue, pnl)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', rows)
+                    cursor.execute('COMMIT')
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
+                
+                # Cache the first trade's timestamp once
+                if self.stats.first_trade_at is None:
+                    cursor.execute('SELECT created_at FROM trades ORDER BY id LIMIT 1')
+                    self.stats.first_trade_at = cursor.fetchone()[0]
             
-            cursor.execute('SELECT * FROM trades ORDER BY timestamp DESC LIMIT ?', (limit,))
-            trades = [dict(row) for row in cursor.fetchall()]
+            for timestamp, coin, trade_type, price, quantity, cost_or_revenue, pnl in rows:
+                self.stats.record(trade_type, cost_or_revenue, pnl)
+            logger.info("%d trades recorded", len(rows))
+            return True
+        except Exception as e:
+            logger.error(f"Error adding trades: {e}")
+            return False
+    
+    def count_trades(self) -> int:
+        """Number of trades stored"""
+        try:
+            with self._lock:
+                return self.conn.execute('SELECT COUNT(*) FROM trades').fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting trades: {e}")
+            return 0
+    
+    def get_all_trades(self, limit: int = 1000):
+        """Get the most recent trades (newest first, at most limit rows)"""
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT * FROM trades ORDER BY id DESC LIMIT ?', (limit,))
+                trades = [dict(row) for row in cursor.fetchall()]
             
-            conn.close()
             return trades
         except Exception as e:
             logger.error(f"Error fetching trades: {e}")
             return []
     
+    def get_trades_before(self, cursor_id: int = None, limit: int = 15):
+        """Get a page of trades newest first, keyed on id (cursor pagination)"""
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                if cursor_id is None:
+                    cursor.execute('SELECT * FROM trades ORDER BY id DESC LIMIT ?', (limit,))
+                else:
+                    cursor.execute('SELECT * FROM trades WHERE id < ? ORDER BY id DESC LIMIT ?',
+                                   (cursor_id, limit))
+                trades = [dict(row) for row in cursor.fetchall()]
+            
+            return trades
+        except Exception as e:
+            logger.error(f"Error fetching trades before {cursor_id}: {e}")
+            return []
+    
+    def iter_all_trades(self, batch_size: int = 500):
+        """Yield every trade row newest first, in id-keyed batches.
+        
+        The lock is only held per batch, so a long export doesn't block writers.
+        """
+        cursor_id = None
+        while True:
+            with self._lock:
+                cursor = self.conn.cursor()
+                if cursor_id is None:
+                    cursor.execute('SELECT * FROM trades ORDER BY id DESC LIMIT ?', (batch_size,))
+                else:
+                    cursor.execute('SELECT * FROM trades WHERE id < ? ORDER BY id DESC LIMIT ?',
+                                   (cursor_id, batch_size))
+                rows = cursor.fetchall()
+            
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            cursor_id = rows[-1]['id']
+    
     def get_trades_by_coin(self, coin: str):
         """Get trades for specific coin"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT * FROM trades WHERE coin = ? ORDER BY timestamp DESC', (coin,))
+                trades = [dict(row) for row in cursor.fetchall()]
             
-            cursor.execute('SELECT * FROM trades WHERE coin = ? ORDER BY timestamp DESC', (coin,))
-            trades = [dict(row) for row in cursor.fetchall()]
-            
-            conn.close()
             return trades
         except Exception as e:
             logger.error(f"Error fetching trades for {coin}: {e}")
@@ -109,16 +315,19 @@ class TradeDatabase:
     def clear_all_trades(self):
         """Clear all trades (for testing)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM trades')
-            conn.commit()
-            conn.close()
+            with self._lock:
+                self.conn.execute('DELETE FROM trades')
+            self.stats.reset()
             logger.warning("All trades cleared!")
             return True
         except Exception as e:
             logger.error(f"Error clearing trades: {e}")
             return False
+    
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            self.conn.close()
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ NO MODIFICATIONS
 
 import pandas as pd
 import numpy as np
+from numba import njit
 from typing import Dict, List
 import logging
 
@@ -12,6 +13,154 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Trade type codes used by the backtest kernel
+TRADE_BUY = 0
+TRADE_SELL = 1
+
+
+def _first_hit_levels(close, high, low, multipliers, grid_size, side):
+    """
+    First grid level hit per candle, in closed form.
+    
+    Levels are close * multipliers, moving away from close (side=-1 for
+    buy levels below it, +1 for sell levels above). A level is hit when
+    low <= level <= high, so the first hit is the first level past the
+    candle's entry bound (high for buys, low for sells):
+    j = ceil(side * (bound / close - 1) / grid_size), nudged by one step
+    to absorb rounding. Returns (hit, level) arrays, where level is only
+    meaningful where hit is True.
+    """
+    last = multipliers.shape[0] - 1
+    bound = high if side < 0 else low
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        steps = np.ceil(side * (bound / close - 1) / grid_size)
+    steps = np.where(np.isfinite(steps), steps, 1)
+    idx = np.clip(steps, 1, last + 1).astype(np.int64) - 1
+    
+    def entered(i):
+        level = close * multipliers[i]
+        return level <= high if side < 0 else level >= low
+    
+    # Undershoot: level j is still outside the bound, step once further out
+    idx += (idx < last) & ~entered(idx)
+    # Overshoot: the previous level was already inside, step back once
+    idx -= (idx > 0) & entered(np.maximum(idx - 1, 0))
+    
+    levels = close * multipliers[idx]
+    return (low <= levels) & (levels <= high), levels
+
+
+# Explicit signature: compiled (or loaded from the on-disk cache) at import,
+# so the first backtest doesn't pay the JIT cost
+_BACKTEST_CORE_SIG = (
+    'Tuple((int64[:], int8[:], float64[:], float64[:], float64[:], float64[:],'
+    ' float64[:], int64, float64[:], float64, float64))'
+    '(float64[:], boolean[:], float64[:], boolean[:], float64[:], float64)'
+)
+
+
+@njit(_BACKTEST_CORE_SIG, cache=True, fastmath=True)
+def _backtest_core(close, buy_hit, buy_levels, sell_hit, sell_levels, initial_capital):
+    """
+    Compiled per-candle grid simulation (the stateful capital/inventory scan).
+    
+    buy_hit/sell_hit flag candles where a grid level was hit and
+    buy_levels/sell_levels hold that level (see _first_hit_levels).
+    
+    Returns SoA trade arrays (bar index, type, price, quantity, amount,
+    gain, tax), the trade count, the balance history and the final
+    capital/inventory. amount is the total cost of a buy or the net
+    proceeds of a sell; gain and tax are only set for sells.
+    """
+    n = close.shape[0]
+    max_trades = 2 * n  # at most one buy and one sell per candle
+    
+    trade_bar = np.empty(max_trades, dtype=np.int64)
+    trade_type = np.empty(max_trades, dtype=np.int8)
+    trade_price = np.empty(max_trades, dtype=np.float64)
+    trade_qty = np.empty(max_trades, dtype=np.float64)
+    trade_amount = np.empty(max_trades, dtype=np.float64)
+    trade_gain = np.empty(max_trades, dtype=np.float64)
+    trade_tax = np.empty(max_trades, dtype=np.float64)
+    num_trades = 0
+    
+    balance_history = np.empty(n + 1, dtype=np.float64)
+    
+    capital = initial_capital
+    inventory = 0.0  # Number of coins held
+    total_cost_basis = 0.0  # Purchase value of the coins held
+    balance_history[0] = capital
+    
+    for i in range(n):
+        price = close[i]
+        
+        # Price hit a buy level (below current price)
+        if buy_hit[i]:
+            buy_level = buy_levels[i]
+            
+            # Buy at this level
+            coins_to_buy = (capital * 0.1) / buy_level  # Use 10% of capital per buy
+            
+            if coins_to_buy > 0:
+                # Execute buy
+                buy_cost = coins_to_buy * buy_level
+                trade_cost_fee = buy_cost * 0.006  # 0.6% trading cost
+                total_cost = buy_cost + trade_cost_fee
+                
+                if capital >= total_cost:
+                    capital -= total_cost
+                    inventory += coins_to_buy
+                    total_cost_basis += coins_to_buy * buy_level
+                    
+                    trade_bar[num_trades] = i
+                    trade_type[num_trades] = TRADE_BUY
+                    trade_price[num_trades] = buy_level
+                    trade_qty[num_trades] = coins_to_buy
+                    trade_amount[num_trades] = total_cost
+                    trade_gain[num_trades] = 0.0
+                    trade_tax[num_trades] = 0.0
+                    num_trades += 1
+        
+        # Price hit a sell level (above current price)
+        if sell_hit[i] and inventory > 0:
+            sell_level = sell_levels[i]
+            
+            # Sell at this level
+            coins_to_sell = inventory * 0.5  # Sell 50% of inventory
+            
+            sell_revenue = coins_to_sell * sell_level
+            trade_cost_fee = sell_revenue * 0.006
+            tds = sell_revenue * 0.01
+            
+            # Calculate tax (30% on gains only)
+            avg_buy_price = total_cost_basis / inventory
+            gross_gain = sell_revenue - (coins_to_sell * avg_buy_price)
+            tax = max(0.0, gross_gain * 0.30)
+            
+            net_proceeds = sell_revenue - trade_cost_fee - tds - tax
+            
+            capital += net_proceeds
+            inventory -= coins_to_sell
+            total_cost_basis -= coins_to_sell * avg_buy_price
+            
+            trade_bar[num_trades] = i
+            trade_type[num_trades] = TRADE_SELL
+            trade_price[num_trades] = sell_level
+            trade_qty[num_trades] = coins_to_sell
+            trade_amount[num_trades] = net_proceeds
+            trade_gain[num_trades] = gross_gain
+            trade_tax[num_trades] = tax
+            num_trades += 1
+        
+        # Update balance (coins at current price + cash)
+        balance_history[i + 1] = capital + inventory * price
+    
+    return (trade_bar, trade_type, trade_price, trade_qty, trade_amount,
+            trade_gain, trade_tax, num_trades,
+            balance_history, capital, inventory)
+
+
 class GridTradingStrategy:
     """
     Grid trading implementation
@@ -27,139 +176,107 @@ class GridTradingStrategy:
         self.grids_count = grids_count
         self.initial_capital = initial_capital
         
-        logger.info(f"Grid Trading Strategy")
-        logger.info(f"  Grid Size: {grid_size*100}%")
-        logger.info(f"  Number of Grids: {grids_count}")
+        # Grid geometry is fixed per strategy: level = close * multiplier
+        steps = grid_size * np.arange(1, grids_count + 1)
+        self._buy_mul = np.ascontiguousarray(1 - steps)
+        self._sell_mul = np.ascontiguousarray(1 + steps)
+        
+        logger.info("Grid Trading Strategy")
+        logger.info("  Grid Size: %s%%", grid_size * 100)
+        logger.info("  Number of Grids: %s", grids_count)
     
     def backtest(self, data: pd.DataFrame) -> Dict:
         """
         Simulate grid trading
         """
         
-        logger.info(f"Backtesting on {len(data)} candles")
+        logger.info("Backtesting on %d candles", len(data))
         
-        # Trading variables
-        capital = self.initial_capital
-        inventory = 0  # Number of coins held
-        avg_buy_price = 0
+        # Raw column arrays, extracted once (no per-row pandas access).
+        # close is copied because the typed kernel needs a writable array.
+        close = data['close'].to_numpy(dtype=np.float64, copy=True)
+        high = np.ascontiguousarray(data['high'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(data['low'].to_numpy(dtype=np.float64))
+        dates = data.index.to_numpy()
         
-        trades = []
-        balance_history = [capital]
+        # Grid geometry for every candle at once: first buy level below /
+        # sell level above the close that falls inside the candle's range
+        buy_hit, buy_levels = _first_hit_levels(close, high, low, self._buy_mul, self.grid_size, -1)
+        sell_hit, sell_levels = _first_hit_levels(close, high, low, self._sell_mul, self.grid_size, 1)
         
-        for i in range(len(data)):
-            current = data.iloc[i]
-            price = current['close']
-            
-            # Calculate grid levels based on current price
-            base_price = price
-            
-            # Buy levels (below current price)
-            buy_levels = [base_price * (1 - self.grid_size * j) for j in range(1, self.grids_count + 1)]
-            
-            # Sell levels (above current price)
-            sell_levels = [base_price * (1 + self.grid_size * j) for j in range(1, self.grids_count + 1)]
-            
-            # Check if price hits any buy level
-            for buy_level in buy_levels:
-                if current['low'] <= buy_level <= current['high']:
-                    # Buy at this level
-                    coins_to_buy = (capital * 0.1) / buy_level  # Use 10% of capital per buy
-                    
-                    if coins_to_buy > 0:
-                        # Execute buy
-                        buy_cost = coins_to_buy * buy_level
-                        trade_cost = buy_cost * 0.006  # 0.6% trading cost
-                        total_cost = buy_cost + trade_cost
-                        
-                        if capital >= total_cost:
-                            capital -= total_cost
-                            inventory += coins_to_buy
-                            avg_buy_price = (avg_buy_price * (inventory - coins_to_buy) + buy_level * coins_to_buy) / inventory if inventory > 0 else buy_level
-                            
-                            trades.append({
-                                'date': current.name,
-                                'type': 'BUY',
-                                'price': buy_level,
-                                'quantity': coins_to_buy,
-                                'cost': total_cost
-                            })
-                    break
-            
-            # Check if price hits any sell level
-            for sell_level in sell_levels:
-                if current['low'] <= sell_level <= current['high']:
-                    if inventory > 0:
-                        # Sell at this level
-                        coins_to_sell = inventory * 0.5  # Sell 50% of inventory
-                        
-                        sell_revenue = coins_to_sell * sell_level
-                        trade_cost = sell_revenue * 0.006
-                        tds = sell_revenue * 0.01
-                        
-                        # Calculate tax (30% on gains only)
-                        gross_gain = sell_revenue - (coins_to_sell * avg_buy_price)
-                        tax = max(0, gross_gain * 0.30)
-                        
-                        net_proceeds = sell_revenue - trade_cost - tds - tax
-                        
-                        capital += net_proceeds
-                        inventory -= coins_to_sell
-                        
-                        trades.append({
-                            'date': current.name,
-                            'type': 'SELL',
-                            'price': sell_level,
-                            'quantity': coins_to_sell,
-                            'revenue': net_proceeds,
-                            'gain': gross_gain,
-                            'tax': tax
-                        })
-                    break
-            
-            # Update balance (coins at current price + cash)
-            current_inventory_value = inventory * price
-            total_balance = capital + current_inventory_value
-            balance_history.append(total_balance)
+        (trade_bar, trade_type, trade_price, trade_qty, trade_amount,
+         trade_gain, trade_tax, num_trades,
+         balance_history, capital, inventory) = _backtest_core(
+            close, buy_hit, buy_levels, sell_hit, sell_levels,
+            float(self.initial_capital)
+        )
         
         # Final balance (convert remaining coins to cash at last price)
-        final_price = data.iloc[-1]['close']
+        final_price = close[-1]
         final_inventory_value = inventory * final_price
         final_balance = capital + final_inventory_value
         
-        # Calculate metrics
-        trades_df = pd.DataFrame(trades) if trades else pd.DataFrame()
+        # Rebuild the trade log once from the kernel's arrays
+        # (buy-only / sell-only columns are NaN on the other type)
+        trade_bar = trade_bar[:num_trades]
+        is_sell = trade_type[:num_trades] == TRADE_SELL
+        trade_amount = trade_amount[:num_trades]
+        trade_gain = trade_gain[:num_trades]
+        
+        if num_trades:
+            trades_df = pd.DataFrame({
+                'date': dates[trade_bar],
+                'type': np.where(is_sell, 'SELL', 'BUY'),
+                'price': trade_price[:num_trades],
+                'quantity': trade_qty[:num_trades],
+                'cost': np.where(is_sell, np.nan, trade_amount),
+                'revenue': np.where(is_sell, trade_amount, np.nan),
+                'gain': np.where(is_sell, trade_gain, np.nan),
+                'tax': np.where(is_sell, trade_tax[:num_trades], np.nan)
+            })
+        else:
+            trades_df = pd.DataFrame()
         
+        # Calculate metrics
         total_return = ((final_balance - self.initial_capital) / self.initial_capital) * 100
         
         # Calculate win rate from sell trades
-        sell_trades = [t for t in trades if t['type'] == 'SELL']
-        winning_sells = len([t for t in sell_trades if t.get('gain', 0) > 0])
+        num_sells = int(np.count_nonzero(is_sell))
+        winning_sells = int(np.count_nonzero(trade_gain[is_sell] > 0))
         
-        win_rate = (winning_sells / len(sell_trades) * 100) if sell_trades else 0
+        win_rate = (winning_sells / num_sells * 100) if num_sells else 0
         
-        # Sharpe ratio
-        returns = np.diff(balance_history) / balance_history[:-1]
-        if len(returns) > 1 and np.std(returns) > 0:
-            sharpe = (np.mean(returns) / np.std(returns)) * np.sqrt(252)
+        # Sharpe ratio (balance_history is already a float64 ndarray)
+        bh = balance_history
+        returns = np.diff(bh)
+        returns /= bh[:-1]
+        if len(returns) > 1:
+            returns_std = returns.std()
+        else:
+            returns_std = 0
+        if returns_std > 0:
+            sharpe = (returns.mean() / returns_std) * np.sqrt(252)
         else:
             sharpe = 0
         
         # Max drawdown
-        peak = np.maximum.accumulate(balance_history)
-        drawdown = (np.array(balance_history) - peak) / peak * 100
-        max_drawdown = np.min(drawdown)
+        peak = np.maximum.accumulate(bh)
+        drawdown = bh - peak
+        drawdown /= peak
+        drawdown *= 100
+        max_drawdown = drawdown.min()
         
         return {
             'final_capital': final_balance,
             'total_return_pct': total_return,
             'profit_loss': final_balance - self.initial_capital,
-            'num_trades': len(trades),
-            'num_buy_trades': len([t for t in trades if t['type'] == 'BUY']),
-            'num_sell_trades': len(sell_trades),
+            'num_trades': num_trades,
+            'num_buy_trades': num_trades - num_sells,
+            'num_sell_trades': num_sells,
             'win_rate_pct': win_rate,
             'sharpe_ratio': sharpe,
             'max_drawdown_pct': max_drawdown,
-            'trades_per_month': len(trades) / (len(data) / (24 * 30)),
+            'trades_per_month': num_trades / (len(data) / (24 * 30)),
             'trades': trades_df,
             'inventory_remaining': inventory,
             'final_price': final_price
@@ -5,22 +5,157 @@ With proper error handling, database persistence, and debugging
 
 import pandas as pd
 import numpy as np
+from numba import njit
 from datetime import datetime
 import ccxt
+import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxt_pro
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from grid_strategy import GridTradingStrategy
 from database import TradeDatabase
 import logging
 import time
+import orjson
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Max seconds to wait for one round of concurrent price fetches
+PRICE_FETCH_TIMEOUT = 10
+
+# Seconds before re-subscribing after a ticker stream error
+STREAM_RETRY_DELAY = 5
+
+# Seconds after which a streamed price no longer counts as current (the
+# coin falls back to a REST fetch until its stream ticks again)
+STREAM_STALE_AFTER = 30
+
+# Seconds between write-behind flushes of buffered trades to the database
+TRADE_FLUSH_INTERVAL = 1
+
+# Failed flushes in a row before the batch is written row by row and
+# rows the database keeps rejecting are set aside
+TRADE_FLUSH_MAX_RETRIES = 5
+
+# Seconds a cached status timestamp stays valid
+STATUS_TIMESTAMP_TTL = 1.0
+
+# Separator line around each grid cycle in the log
+_BANNER = "=" * 50
+
+# Warning templates for the per-coin paths (formatted lazily by logging)
+_MSG_NO_EXCHANGE = "⚠️  No exchange connection for %s"
+_MSG_STREAM_ERROR = "⚠️  Ticker stream error for %s: %s"
+_MSG_NO_FUNDS = "⚠️  Insufficient capital for %s buy"
+_MSG_FETCH_FAILED = "⚠️  Could not fetch price for %s"
+_MSG_NO_PRICE = "⚠️  No price for %s, skipping"
+
+# Order kernel outcome codes, per coin
+ORDER_NONE = 0
+ORDER_FILLED = 1
+ORDER_NO_FUNDS = -1
+
+
+_APPLY_BUY_SIG = (
+    'Tuple((int8[:], float64[:], float64[:]))'
+    '(float64[:], float64[:], float64[:], float64[:], boolean[:], float64, float64)'
+)
+
+
+@njit(_APPLY_BUY_SIG, cache=True)
+def _apply_buy(cap, inv, avg, price, active, frac, cost_mult):
+    """
+    Compiled buy pass over the portfolio arrays (updated in place).
+    
+    Each active coin buys frac of its capital at price[i], paying
+    order * cost_mult. Returns (status, quantity, cost) per coin.
+    """
+    n = cap.shape[0]
+    status = np.zeros(n, dtype=np.int8)
+    qty = np.zeros(n, dtype=np.float64)
+    cost = np.zeros(n, dtype=np.float64)
+    
+    for i in range(n):
+        if not active[i]:
+            continue
+        order = cap[i] * frac
+        total_cost = order * cost_mult
+        if cap[i] < total_cost:
+            status[i] = ORDER_NO_FUNDS
+            continue
+        
+        bought = order / price[i]
+        new_inv = inv[i] + bought
+        if inv[i] > 0:
+            avg[i] = (avg[i] * inv[i] + price[i] * bought) / new_inv
+        else:
+            avg[i] = price[i]
+        inv[i] = new_inv
+        cap[i] -= total_cost
+        
+        status[i] = ORDER_FILLED
+        qty[i] = bought
+        cost[i] = total_cost
+    
+    return status, qty, cost
+
+
+_APPLY_SELL_SIG = (
+    'Tuple((int8[:], float64[:], float64[:], float64[:]))'
+    '(float64[:], float64[:], float64[:], float64[:], boolean[:], float64, float64, float64)'
+)
+
+
+@njit(_APPLY_SELL_SIG, cache=True)
+def _apply_sell(cap, inv, avg, price, active, frac, gross_keep, tax):
+    """
+    Compiled sell pass over the portfolio arrays (updated in place).
+    
+    Each active coin holding inventory sells frac of it at price[i]; net
+    proceeds are gross * gross_keep - tax * max(0, gross - cost basis).
+    Returns (status, quantity, net_proceeds, pnl) per coin.
+    """
+    n = cap.shape[0]
+    status = np.zeros(n, dtype=np.int8)
+    qty = np.zeros(n, dtype=np.float64)
+    net = np.zeros(n, dtype=np.float64)
+    pnl = np.zeros(n, dtype=np.float64)
+    
+    for i in range(n):
+        if not active[i] or inv[i] <= 0:
+            continue
+        sold = inv[i] * frac
+        gross = sold * price[i]
+        cost_basis = sold * avg[i]
+        proceeds = gross * gross_keep - tax * max(0.0, gross - cost_basis)
+        cap[i] += proceeds
+        inv[i] -= sold
+        
+        status[i] = ORDER_FILLED
+        qty[i] = sold
+        net[i] = proceeds
+        pnl[i] = proceeds - cost_basis
+    
+    return status, qty, net, pnl
+
 
 class PaperTradingEngine:
     """
     Live paper trading simulator with persistence
     """
     
+    # Order sizing and cost constants
+    ORDER_FRAC = 0.1                        # 10% of capital per buy
+    SELL_FRAC = 0.5                         # 50% of inventory per sell
+    FEE = 0.006                             # exchange fee (0.6%)
+    TDS = 0.01                              # TDS on sale value (1%)
+    TAX = 0.30                              # tax on positive gains (30%)
+    TOTAL_COST_MULT = 1 + FEE               # buy cost including fees
+    SELL_GROSS_KEEP = 1 - FEE - TDS         # share of sale value kept before tax
+    
     def __init__(self, coins_config: dict):
         """
         coins_config: {
@@ -30,41 +165,124 @@ class PaperTradingEngine:
         """
         self.coins_config = coins_config
         self.db = TradeDatabase()
+        self._trade_count = self.db.count_trades()
         
-        # Initialize portfolio
-        self.portfolio = {}
-        for coin, config in coins_config.items():
-            self.portfolio[coin] = {
-                'capital': config['capital'],
-                'inventory': 0,
-                'avg_buy_price': 0,
-                'current_price': 0,
-                'inventory_value': 0,
-                'grid_size': config['grid_size']
-            }
+        # Write-behind trade buffer: trades are queued and inserted in batches
+        # (one transaction per flush) by a background thread
+        self._trade_buf = deque()
+        self._buf_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # keeps batches in order
+        self._stop_flush = threading.Event()
+        self._flush_failures = 0
+        self.rejected_trades = []  # rows the database would not accept
+        self._flush_thread = threading.Thread(target=self._flush_loop,
+                                              name='trade-flush', daemon=True)
+        self._flush_thread.start()
+        
+        # Initialize portfolio as parallel per-coin arrays (SoA), indexed by _idx
+        self._coins = tuple(coins_config)
+        self._idx = {coin: i for i, coin in enumerate(self._coins)}
+        self._cap = np.array([coins_config[c]['capital'] for c in self._coins], dtype=np.float64)
+        self._inv = np.zeros(len(self._coins), dtype=np.float64)
+        self._avg = np.zeros(len(self._coins), dtype=np.float64)
+        self._price = np.zeros(len(self._coins), dtype=np.float64)
+        self._inv_val = np.zeros(len(self._coins), dtype=np.float64)
+        self._gs = np.array([coins_config[c]['grid_size'] for c in self._coins], dtype=np.float64)
         
-        # Try to initialize exchange
+        # Exchange symbols, formatted once
+        self._symbols = {coin: f'{coin}/USDT' for coin in self._coins}
+        
+        # Price each coin was last traded against; unchanged prices skip the cycle
+        self._last_cycle_price = np.zeros(len(self._coins), dtype=np.float64)
+        
+        # Try to initialize exchange. The rate-limited client is kept for signed
+        # endpoints; public ticker reads go through read_exchange, which skips
+        # ccxt's client-side throttle sleeps (each client pools its own session)
         try:
             self.exchange = ccxt.binance({'enableRateLimit': True})
+            self.read_exchange = ccxt.binance({'enableRateLimit': False})
             logger.info("✅ Connected to Binance")
         except Exception as e:
             logger.error(f"❌ Exchange error: {e}")
             self.exchange = None
+            self.read_exchange = None
+        
+        # Async client for concurrent ticker fetches, driven by one persistent
+        # event loop in a background thread (its HTTP session is bound to it)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                             name='exchange-io', daemon=True)
+        self._loop_thread.start()
+        try:
+            self.aexchange = ccxt_async.binance({'enableRateLimit': False})  # public reads only
+        except Exception as e:
+            logger.error(f"❌ Async exchange error: {e}")
+            self.aexchange = None
+        
+        # Live price feed: one WebSocket ticker subscription per coin keeps
+        # latest_prices current ({coin: (price, monotonic time received)}),
+        # so cycles read prices from memory
+        self.latest_prices = {}
+        self._prices_ready = threading.Event()  # set once every coin has ticked
+        self._awaited_feed = False
+        try:
+            self.pro = ccxt_pro.binance()
+            self._stream_future = asyncio.run_coroutine_threadsafe(self._stream_all(), self._loop)
+        except Exception as e:
+            logger.error(f"❌ Price stream error: {e}")
+            self.pro = None
+            self._stream_future = None
+        
+        # Static per-coin multipliers for the nearest grid level (the only one
+        # the cycle trades): buy at price * (1 - grid_size), sell at price * (1 + grid_size)
+        self._buy_mul = 1 - self._gs
+        self._sell_mul = 1 + self._gs
         
         self.trading_active = False
         self.last_update = datetime.now()
+        self.last_update_iso = self.last_update.isoformat()
+        self._status_ts = (time.monotonic(), self.last_update_iso)
+        self._status_bytes = None
         logger.info("Paper Trading Engine Initialized ✅")
     
+    @property
+    def portfolio(self) -> dict:
+        """Per-coin dict view of the portfolio arrays (built on access)"""
+        return {
+            coin: {
+                'capital': capital,
+                'inventory': inventory,
+                'avg_buy_price': avg_buy_price,
+                'current_price': current_price,
+                'inventory_value': inventory_value,
+                'grid_size': grid_size
+            }
+            for coin, capital, inventory, avg_buy_price, current_price, inventory_value, grid_size
+            in zip(self._coins, self._cap.tolist(), self._inv.tolist(), self._avg.tolist(),
+                   self._price.tolist(), self._inv_val.tolist(), self._gs.tolist())
+        }
+    
+    def _streamed_price(self, coin: str):
+        """Latest streamed price for coin, or None if never received or stale"""
+        entry = self.latest_prices.get(coin)
+        if entry is None or time.monotonic() - entry[1] > STREAM_STALE_AFTER:
+            return None
+        return entry[0]
+    
     def fetch_current_price(self, symbol: str) -> float:
-        """Fetch current price from exchange"""
+        """Current price from the live feed, or fetched from exchange if not streamed recently"""
+        price = self._streamed_price(symbol.split('/')[0])
+        if price is not None:
+            return price
+        
         try:
-            if not self.exchange:
-                logger.warning(f"⚠️  No exchange connection for {symbol}")
+            if not self.read_exchange:
+                logger.warning(_MSG_NO_EXCHANGE, symbol)
                 return None
             
-            ticker = self.exchange.fetch_ticker(symbol)
+            ticker = self.read_exchange.fetch_ticker(symbol)
             price = ticker['last']
-            logger.debug(f"Fetched {symbol}: ${price:.2f}")
+            logger.debug("Fetched %s: $%.2f", symbol, price)
             return price
         
         except ccxt.NetworkError as e:
@@ -77,48 +295,128 @@ class PaperTradingEngine:
             logger.error(f"❌ Error fetching {symbol}: {e}")
             return None
     
-    def execute_buy(self, coin: str, price: float) -> bool:
-        """Execute buy order"""
+    async def _stream(self, coin: str):
+        """Keep latest_prices[coin] updated from the WebSocket ticker"""
+        symbol = self._symbols[coin]
+        while True:
+            try:
+                ticker = await self.pro.watch_ticker(symbol)
+                self.latest_prices[coin] = (ticker['last'], time.monotonic())
+                if len(self.latest_prices) == len(self._coins):
+                    self._prices_ready.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(_MSG_STREAM_ERROR, symbol, e)
+                await asyncio.sleep(STREAM_RETRY_DELAY)
+    
+    async def _stream_all(self):
+        """Run one ticker stream per coin"""
+        await asyncio.gather(*[self._stream(coin) for coin in self._coins])
+    
+    async def _async_update(self, coins: list) -> dict:
+        """Fetch the coins' prices in one fetch_tickers call: {coin: price or exception}"""
+        symbols = [self._symbols[coin] for coin in coins]
         try:
-            portfolio = self.portfolio[coin]
-            
-            # Calculate order
-            order_amount = portfolio['capital'] * 0.1  # 10% per order
-            coins_to_buy = order_amount / price
+            tickers = await self.aexchange.fetch_tickers(symbols)
+        except Exception as e:
+            return {coin: e for coin in coins}
+        return {coin: tickers.get(symbol, {}).get('last') for coin, symbol in zip(coins, symbols)}
+    
+    def _record_trades(self, rows: list):
+        """Queue trade rows (coin, type, price, qty, cost_or_revenue, pnl) for the next write-behind flush"""
+        if not rows:
+            return
+        # Stamp with the fill time now, not whenever the flush succeeds
+        timestamp = datetime.now().isoformat()
+        with self._buf_lock:
+            self._trade_buf.extend((timestamp,) + row for row in rows)
+            self._trade_count += len(rows)
+    
+    def flush_trades(self) -> bool:
+        """Write all buffered trades in one transaction"""
+        with self._flush_lock:
+            with self._buf_lock:
+                batch = list(self._trade_buf)
+                self._trade_buf.clear()
             
-            # Include fees (0.6%)
-            total_cost = order_amount * 1.006
+            if not batch:
+                return True
+            if self.db.add_trades_bulk(batch):
+                self._flush_failures = 0
+                return True
             
-            # Check if we have enough capital
-            if portfolio['capital'] < total_cost:
-                logger.warning(f"⚠️  Insufficient capital for {coin} buy")
+            self._flush_failures += 1
+            if self._flush_failures < TRADE_FLUSH_MAX_RETRIES:
+                # Likely transient (e.g. database locked): keep them for the next flush
+                with self._buf_lock:
+                    self._trade_buf.extendleft(reversed(batch))
                 return False
             
-            # Execute
-            portfolio['capital'] -= total_cost
-            old_inventory = portfolio['inventory']
-            portfolio['inventory'] += coins_to_buy
-            
-            # Update avg buy price
-            if old_inventory > 0:
-                portfolio['avg_buy_price'] = (
-                    (portfolio['avg_buy_price'] * old_inventory + price * coins_to_buy) / 
-                    portfolio['inventory']
-                )
-            else:
-                portfolio['avg_buy_price'] = price
-            
-            # Log trade
-            self.db.add_trade(
-                coin=coin,
-                trade_type='BUY',
-                price=price,
-                quantity=coins_to_buy,
-                cost_or_revenue=total_cost,
-                pnl=0
-            )
-            
-            logger.info(f"✅ BUY {coin}: {coins_to_buy:.6f} @ ${price:.2f}")
+            # Still failing: write row by row so one bad row can't block the rest
+            self._flush_failures = 0
+            rejected = [row for row in batch if not self.db.add_trades_bulk([row])]
+            if rejected:
+                for row in rejected:
+                    logger.error(f"❌ Trade rejected by database, set aside: {row}")
+                self.rejected_trades.extend(rejected)
+                with self._buf_lock:
+                    self._trade_count -= len(rejected)
+            return not rejected
+    
+    def _flush_loop(self):
+        """Flush buffered trades every TRADE_FLUSH_INTERVAL seconds"""
+        while not self._stop_flush.wait(TRADE_FLUSH_INTERVAL):
+            try:
+                self.flush_trades()
+            except Exception as e:
+                logger.error(f"❌ Error flushing trades: {e}")
+    
+    def _buy_row(self, i: int, status, prices, qty, cost):
+        """Trade row for coin i from a buy pass, or None (logs the outcome)"""
+        coin = self._coins[i]
+        if status[i] == ORDER_NO_FUNDS:
+            logger.warning(_MSG_NO_FUNDS, coin)
+            return None
+        if status[i] != ORDER_FILLED:
+            return None
+        
+        price = float(prices[i])
+        quantity = float(qty[i])
+        logger.info("✅ BUY %s: %.6f @ $%.2f", coin, quantity, price)
+        return (coin, 'BUY', price, quantity, float(cost[i]), 0)
+    
+    def _sell_row(self, i: int, status, prices, qty, net, pnl):
+        """Trade row for coin i from a sell pass, or None (logs the outcome)"""
+        if status[i] != ORDER_FILLED:
+            return None
+        
+        coin = self._coins[i]
+        price = float(prices[i])
+        quantity = float(qty[i])
+        trade_pnl = float(pnl[i])
+        logger.info("✅ SELL %s: %.6f @ $%.2f | P&L: ₹%.2f", coin, quantity, price, trade_pnl)
+        return (coin, 'SELL', price, quantity, float(net[i]), trade_pnl)
+    
+    def _single_order(self, coin: str, price: float):
+        """(index, one-hot active mask, price vector) for a single-coin order"""
+        i = self._idx[coin]
+        active = np.zeros(len(self._coins), dtype=np.bool_)
+        active[i] = True
+        prices = np.zeros(len(self._coins), dtype=np.float64)
+        prices[i] = price
+        return i, active, prices
+    
+    def execute_buy(self, coin: str, price: float) -> bool:
+        """Execute buy order"""
+        try:
+            i, active, prices = self._single_order(coin, price)
+            status, qty, cost = _apply_buy(self._cap, self._inv, self._avg, prices, active,
+                                           self.ORDER_FRAC, self.TOTAL_COST_MULT)
+            row = self._buy_row(i, status, prices, qty, cost)
+            if row is None:
+                return False
+            self._record_trades([row])
             return True
         
         except Exception as e:
@@ -128,46 +426,13 @@ class PaperTradingEngine:
     def execute_sell(self, coin: str, price: float) -> bool:
         """Execute sell order"""
         try:
-            portfolio = self.portfolio[coin]
-            
-            # Check if we have inventory
-            if portfolio['inventory'] <= 0:
+            i, active, prices = self._single_order(coin, price)
+            status, qty, net, pnl = _apply_sell(self._cap, self._inv, self._avg, prices, active,
+                                                self.SELL_FRAC, self.SELL_GROSS_KEEP, self.TAX)
+            row = self._sell_row(i, status, prices, qty, net, pnl)
+            if row is None:
                 return False
-            
-            # Sell 50% of inventory
-            coins_to_sell = portfolio['inventory'] * 0.5
-            
-            # Calculate revenue
-            gross_revenue = coins_to_sell * price
-            
-            # Deduct fees
-            trade_fee = gross_revenue * 0.006
-            tds = gross_revenue * 0.01
-            
-            # Calculate gains
-            gross_gain = gross_revenue - (coins_to_sell * portfolio['avg_buy_price'])
-            tax = max(0, gross_gain * 0.30)
-            
-            # Net proceeds
-            net_proceeds = gross_revenue - trade_fee - tds - tax
-            
-            # Execute
-            portfolio['capital'] += net_proceeds
-            portfolio['inventory'] -= coins_to_sell
-            
-            pnl = net_proceeds - (coins_to_sell * portfolio['avg_buy_price'])
-            
-            # Log trade
-            self.db.add_trade(
-                coin=coin,
-                trade_type='SELL',
-                price=price,
-                quantity=coins_to_sell,
-                cost_or_revenue=net_proceeds,
-                pnl=pnl
-            )
-            
-            logger.info(f"✅ SELL {coin}: {coins_to_sell:.6f} @ ${price:.2f} | P&L: ₹{pnl:.2f}")
+            self._record_trades([row])
             return True
         
         except Exception as e:
@@ -177,18 +442,47 @@ class PaperTradingEngine:
     def update_portfolio_values(self):
         """Update current prices and inventory values"""
         try:
-            for coin in self.portfolio.keys():
-                price = self.fetch_current_price(f'{coin}/USDT')
+            # First cycle: give the live feed a chance to deliver every coin
+            if self.pro and not self._awaited_feed:
+                self._prices_ready.wait(timeout=PRICE_FETCH_TIMEOUT)
+                self._awaited_feed = True
+            
+            # Streamed prices are a memory read; REST only for coins with no
+            # recent tick (stream not up yet, or stalled)
+            prices = {}
+            missing = []
+            for coin in self._coins:
+                price = self._streamed_price(coin)
+                if price is None:
+                    missing.append(coin)
+                else:
+                    prices[coin] = price
+            
+            if missing and self.aexchange:
+                # One batched ticker request (one round-trip and rate-limit slot, not one per coin)
+                future = asyncio.run_coroutine_threadsafe(self._async_update(missing), self._loop)
+                try:
+                    prices.update(future.result(timeout=PRICE_FETCH_TIMEOUT))
+                except FutureTimeoutError:
+                    future.cancel()
+                    logger.error("❌ Timed out fetching prices")
+            
+            for i, coin in enumerate(self._coins):
+                price = prices.get(coin)
+                
+                if isinstance(price, Exception):
+                    logger.error(f"❌ Error fetching {self._symbols[coin]}: {price}")
+                    price = None
                 
                 if price is None:
-                    logger.warning(f"⚠️  Could not fetch price for {coin}")
+                    logger.warning(_MSG_FETCH_FAILED, coin)
                     continue
                 
-                portfolio = self.portfolio[coin]
-                portfolio['current_price'] = price
-                portfolio['inventory_value'] = portfolio['inventory'] * price
+                self._price[i] = price
+                self._inv_val[i] = self._inv[i] * price
             
             self.last_update = datetime.now()
+            self.last_update_iso = self.last_update.isoformat()
             logger.debug("Portfolio values updated ✅")
             return True
         
@@ -199,67 +493,130 @@ class PaperTradingEngine:
     def execute_grid_trading_cycle(self):
         """Execute one grid trading cycle for all coins"""
         try:
-            logger.info("=" * 50)
+            logger.info(_BANNER)
             logger.info("GRID TRADING CYCLE START")
-            logger.info("=" * 50)
+            logger.info(_BANNER)
             
             # Update prices first
             self.update_portfolio_values()
             
-            for coin in self.portfolio.keys():
-                portfolio = self.portfolio[coin]
-                price = portfolio['current_price']
-                
-                if price == 0:
-                    logger.warning(f"⚠️  No price for {coin}, skipping")
-                    continue
-                
-                grid_size = portfolio['grid_size']
-                
-                # Calculate grid levels
-                buy_levels = [price * (1 - grid_size * j) for j in range(1, 11)]
-                sell_levels = [price * (1 + grid_size * j) for j in range(1, 11)]
-                
-                # Buy at lowest available level
-                if portfolio['inventory'] < 1:  # Only buy if we have room
-                    self.execute_buy(coin, buy_levels[0])
-                
-                # Sell if we have inventory
-                if portfolio['inventory'] > 0:
-                    self.execute_sell(coin, sell_levels[0])
+            prices = self._price
+            
+            for i in np.flatnonzero(prices == 0):
+                logger.warning(_MSG_NO_PRICE, self._coins[i])
+            
+            # Same price as last cycle: the grid signal cannot have changed
+            active = (prices != 0) & (prices != self._last_cycle_price)
+            self._last_cycle_price[active] = prices[active]
+            
+            # Buy at the nearest level below where there is room, then sell
+            # from inventory at the nearest level above; each is one compiled
+            # pass over all coins
+            buy_prices = prices * self._buy_mul
+            sell_prices = prices * self._sell_mul
+            buy_status, buy_qty, buy_cost = _apply_buy(
+                self._cap, self._inv, self._avg, buy_prices, active & (self._inv < 1),
+                self.ORDER_FRAC, self.TOTAL_COST_MULT)
+            sell_status, sell_qty, sell_net, sell_pnl = _apply_sell(
+                self._cap, self._inv, self._avg, sell_prices, active,
+                self.SELL_FRAC, self.SELL_GROSS_KEEP, self.TAX)
+            
+            # Log and queue the cycle's trades in one batch, coin by coin
+            rows = []
+            for i in np.flatnonzero(active):
+                buy = self._buy_row(i, buy_status, buy_prices, buy_qty, buy_cost)
+                sell = self._sell_row(i, sell_status, sell_prices, sell_qty, sell_net, sell_pnl)
+                rows.extend(row for row in (buy, sell) if row is not None)
+            self._record_trades(rows)
+            
+            self._refresh_status_bytes()
             
             logger.info("GRID TRADING CYCLE END ✅")
-            logger.info("=" * 50)
+            logger.info(_BANNER)
             return True
         
         except Exception as e:
             logger.error(f"❌ Grid trading cycle failed: {e}")
             return False
     
+    def _status_timestamp(self) -> str:
+        """ISO timestamp for status polls, regenerated at most once per STATUS_TIMESTAMP_TTL"""
+        now = time.monotonic()
+        if now - self._status_ts[0] > STATUS_TIMESTAMP_TTL:
+            self._status_ts = (now, datetime.now().isoformat())
+        return self._status_ts[1]
+    
+    def _build_status_dict(self) -> dict:
+        """Assemble the status payload from in-memory state"""
+        total_value = float((self._cap + self._inv_val).sum())
+        
+        return {
+            'timestamp': self._status_timestamp(),
+            'portfolio': self.portfolio,
+            'total_value': total_value,
+            'trading_active': self.trading_active,
+            'last_update': self.last_update_iso,
+            'num_trades': self._trade_count
+        }
+    
+    def _refresh_status_bytes(self):
+        """Serialize the status payload once, for reuse by every poll until the next cycle"""
+        try:
+            self._status_bytes = orjson.dumps(self._build_status_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
+        except Exception as e:
+            logger.error(f"❌ Error serializing status: {e}")
+            self._status_bytes = None
+    
+    def get_status_json(self):
+        """Get current status for UI as pre-serialized JSON bytes"""
+        if self._status_bytes is None:
+            self._refresh_status_bytes()
+        return self._status_bytes
+    
     def get_status(self):
         """Get current status for UI"""
         try:
-            total_value = 0
-            
-            for coin, portfolio in self.portfolio.items():
-                total_value += portfolio['capital'] + portfolio['inventory_value']
-            
-            return {
-                'timestamp': datetime.now().isoformat(),
-                'portfolio': self.portfolio,
-                'total_value': total_value,
-                'trading_active': self.trading_active,
-                'last_update': self.last_update.isoformat(),
-                'num_trades': len(self.db.get_all_trades())
-            }
+            return self._build_status_dict()
         
         except Exception as e:
             logger.error(f"❌ Error getting status: {e}")
             return None
     
+    def close(self):
+        """Flush pending trades, then release exchange sessions, the event loop and the database"""
+        self._stop_flush.set()
+        self._flush_thread.join(timeout=5)
+        self.flush_trades()
+        
+        if self._stream_future:
+            self._stream_future.cancel()
+        if self.pro:
+            asyncio.run_coroutine_threadsafe(self.pro.close(), self._loop).result(timeout=5)
+        if self.aexchange:
+            asyncio.run_coroutine_threadsafe(self.aexchange.close(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        self.db.close()
+    
+    def get_trades_before(self, cursor_id: int = None, limit: int = 15):
+        """Page of trades older than cursor_id, newest first (buffered trades included)"""
+        self.flush_trades()
+        return self.db.get_trades_before(cursor_id, limit)
+    
+    def iter_all_trades(self):
+        """Stream every trade, newest first (buffered trades included)"""
+        self.flush_trades()
+        return self.db.iter_all_trades()
+    
+    def get_trade_stats(self) -> dict:
+        """Running trade aggregates (buffered trades included)"""
+        self.flush_trades()
+        return self.db.stats.snapshot()
+    
     def get_recent_trades(self, limit: int = 100):
         """Get recent trades from database"""
         try:
+            self.flush_trades()
             return self.db.get_all_trades(limit)
         except Exception as e:
             logger.error(f"❌ Error fetching trades: {e}")
@@ -2,8 +2,8 @@
 
 let updateInterval;
 let tradingActive = false;
-let currentPage = 1;
-let totalPages = 1;
+let currentCursor = null;   // `before` id of the page being shown (null = newest)
+let cursorHistory = [];     // cursors of the newer pages, for "Previous"
 let priceCache = {};
 let lastPriceFetch = 0;
 
@@ -44,7 +44,7 @@ async function fetchDashboard() {
         // Fetch additional stats
         fetchStats();
         updatePortfolioTable(data.portfolio);
-        updateTradesTable(currentPage);
+        updateTradesTable(currentCursor);
         
     } catch (error) {
         console.error('Dashboard error:', error);
@@ -143,9 +143,10 @@ async function getPriceEfficiently(coin) {
     }
 }
 
-async function updateTradesTable(page = 1) {
+async function updateTradesTable(cursor = null) {
     try {
-        const response = await fetch(`/api/trades?page=${page}`);
+        const query = cursor === null ? '' : `&before=${cursor}`;
+        const response = await fetch(`/api/trades?limit=15${query}`);
         if (!response.ok) throw new Error(`HTTP ${response.status}`);
         
         const data = await response.json();
@@ -174,53 +175,48 @@ async function updateTradesTable(page = 1) {
         }
         
         // Update pagination
-        updatePagination(data.page, data.total_pages, data.total_trades);
-        currentPage = data.page;
-        totalPages = data.total_pages;
+        currentCursor = cursor;
+        updatePagination(data.has_prev, data.next_cursor);
         
     } catch (error) {
         console.error('Trades error:', error);
     }
 }
 
-function updatePagination(page, totalPages, totalTrades) {
+function updatePagination(hasPrev, nextCursor) {
     const controls = document.getElementById('paginationControls');
     controls.innerHTML = '';
     
-    // Previous button
-    if (page > 1) {
+    // Previous (newer) button
+    if (hasPrev) {
         controls.innerHTML += `
             <li class="page-item">
-                <a class="page-link" href="#" onclick="goToPage(${page - 1})">Previous</a>
+                <a class="page-link" href="#" onclick="goToNewerPage()">Previous</a>
             </li>
         `;
     }
     
-    // Page numbers
-    for (let i = Math.max(1, page - 2); i <= Math.min(totalPages, page + 2); i++) {
-        controls.innerHTML += `
-            <li class="page-item ${i === page ? 'active' : ''}">
-                <a class="page-link" href="#" onclick="goToPage(${i})">${i}</a>
-            </li>
-        `;
-    }
-    
-    // Next button
-    if (page < totalPages) {
+    // Next (older) button
+    if (nextCursor !== null) {
         controls.innerHTML += `
             <li class="page-item">
-                <a class="page-link" href="#" onclick="goToPage(${page + 1})">Next</a>
+                <a class="page-link" href="#" onclick="goToOlderPage(${nextCursor})">Next</a>
             </li>
         `;
     }
     
     // Add info
-    controls.innerHTML += `<li class="page-item disabled"><span class="page-link">${totalTrades} total trades</span></li>`;
+    controls.innerHTML += `<li class="page-item disabled"><span class="page-link">Page ${cursorHistory.length + 1}</span></li>`;
+}
+
+function goToOlderPage(cursor) {
+    cursorHistory.push(currentCursor);
+    updateTradesTable(cursor);
 }
 
-function goToPage(page) {
-    currentPage = page;
-    updateTradesTable(page);
+function goToNewerPage() {
+    const cursor = cursorHistory.length ? cursorHistory.pop() : null;
+    updateTradesTable(cursor);
 }
 
 async function startTrading() {